@@ -5,41 +5,48 @@
 This script converts markdown files to HTML (saved to asset/html),
 replaces relative image paths with absolute GitHub RAW URLs,
 and generates a well-formatted RSS 2.0 XML file with links to HTML files.
+
+Usage:
+    python scripts/generate_rss.py [--no-emit-html] [--date-source {yaml,git}]
+
+Environment:
+    RSS_TITLE, RSS_LINK, MD_DIR, RSS_ICON_PATH
+                             override the defaults in the configuration below
+    RSS_CACHE_DISABLE=1      ignore cached renders and rebuild every post
+    RSS_MD_BACKEND=pyromark  convert with pyromark instead of Python-Markdown
 """
 
+import argparse
+import hashlib
+import json
 import os
 import re
 import subprocess
-import sys
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime
+from functools import cache
+from urllib.parse import quote
 from xml.etree import ElementTree as ET
-from xml.dom import minidom
-
-# Try to import markdown, install if missing
-try:
-    import markdown
-except ImportError:
-    subprocess.check_call(
-        [sys.executable, "-m", "pip", "install", "markdown"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
-    import markdown
+from xml.sax.saxutils import escape
 
 # -----------------------------------------------------------------------------
 # Configuration Constants (All caps with underscores, grouped and documented)
 # -----------------------------------------------------------------------------
-# RSS Feed Core Configuration
-RSS_TITLE = "IT咖啡馆的github每周热点项目"
-RSS_LINK = "https://itcoffee66.github.io/githubweekly"  # Replace with your repo URL
+# RSS Feed Core Configuration (RSS_TITLE/RSS_LINK can be overridden via environment)
+RSS_TITLE = os.environ.get("RSS_TITLE", "IT咖啡馆的github每周热点项目")
+RSS_LINK = os.environ.get("RSS_LINK", "https://itcoffee66.github.io/githubweekly")  # Replace with your repo URL
 RSS_DESCRIPTION = "github 每周热点项目"
 RSS_LANGUAGE = "zh-CN"
 
 # File Path Configuration
-MD_DIR = "post/"  # Directory containing markdown files
+MD_DIR = os.environ.get("MD_DIR", "post/")  # Directory containing markdown files
 HTML_OUTPUT_DIR = "asset/html"  # 新增：HTML输出目录
 RSS_OUTPUT_FILE = "rss.xml"  # Output RSS file name
-RSS_ICON_PATH = "/asset/it-coffee-circle.png"  # Icon path within repo
+RSS_ICON_PATH = os.environ.get("RSS_ICON_PATH", "/asset/it-coffee-circle.png")  # Icon path within repo
+
+# Render Cache Configuration (set RSS_CACHE_DISABLE=1 to force a full rebuild)
+CACHE_DIR = ".cache"
+RENDER_CACHE_FILE = os.path.join(CACHE_DIR, "rss_render.json")
 
 # Markdown Conversion Configuration
 MD_EXTENSIONS = [
@@ -49,6 +56,19 @@ MD_EXTENSIONS = [
     "nl2br",  # Convert newlines to <br> tags
 ]
 MD_EXTENSION_CONFIGS = {"codehilite": {"linenums": False, "css_class": "code-block"}}
+# Converter backend: "markdown" (Python-Markdown with the extensions above) or
+# "pyromark" (Rust pulldown-cmark bindings, much faster and releases the GIL,
+# but has no nl2br/codehilite equivalent, so the HTML differs)
+MD_BACKEND = os.environ.get("RSS_MD_BACKEND", "markdown")
+PYROMARK_OPTIONS = ("ENABLE_TABLES", "ENABLE_STRIKETHROUGH", "ENABLE_FOOTNOTES", "ENABLE_TASKLISTS")
+# Mixed into every cache key so that changing the extensions, or the parsing
+# and templating code in this script, invalidates the cache
+with open(__file__, "rb") as _script_handle:
+    _RENDER_CACHE_TAG = (
+        repr((MD_BACKEND, MD_EXTENSIONS, MD_EXTENSION_CONFIGS, PYROMARK_OPTIONS, RSS_LINK)).encode("utf-8")
+        + hashlib.blake2b(_script_handle.read(), digest_size=16).digest()
+    )
+_RENDER_CACHE_TAG_HEX = hashlib.blake2b(_RENDER_CACHE_TAG, digest_size=16).hexdigest()
 
 # HTML Styling (for better RSS reader rendering and standalone HTML files)
 HTML_STYLE = """
@@ -65,6 +85,35 @@ HTML_STYLE = """
         .post-meta { color: #7f8c8d; font-size: 0.9em; margin-bottom: 20px; padding-bottom: 10px; border-bottom: 1px solid #eee; }
     </style>
 """
+# RSS正文的固定包裹部分，只拼接一次
+_RSS_PREFIX = f"<div style='max-width: 800px; margin: 0 auto;'>{HTML_STYLE}"
+_RSS_SUFFIX = "</div>"
+
+
+# YAML front matter: the block itself, and one "key: 'value'" line per field
+_META_BLOCK_RE = re.compile(r"\A---\s*\n(.*?)\n---\s*\n", re.DOTALL)
+_META_FIELD_RE = re.compile(r"^(title|date|description)\s*:\s*[\"'](.*?)[\"']\s*$", re.MULTILINE)
+
+# Markdown image syntax: ![alt](path) or ![alt](path "title")
+_IMAGE_RE = re.compile(r'!\[(.*?)\]\((.*?)(?:\s+".*?")?\)')
+
+# RFC 822 day/month names (fixed English abbreviations, independent of locale)
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# Build time in RFC 822 format: the channel pubDate, and the fallback when a
+# post date cannot be parsed
+_NOW_RFC822 = datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+# Repository root, resolved once (the script is run from the repo root)
+_REPO_ROOT = os.path.abspath("./")
+
+# Base URL of the generated HTML pages; item links append the quoted file name
+_POST_URL_BASE = f"{RSS_LINK}/{HTML_OUTPUT_DIR}/"
+
+# Channel icon URL, or None if the icon file is missing (path check without leading /)
+_ICON_LOCAL = RSS_ICON_PATH.lstrip("/")
+_ICON_LINK = f"{RSS_LINK}/{quote(_ICON_LOCAL)}" if os.path.isfile(_ICON_LOCAL) else None
 
 
 # -----------------------------------------------------------------------------
@@ -81,36 +130,28 @@ def parse_md_metadata(md_content):
             - metadata_dict: 包含title/date/description的字典，缺失则返回默认值
             - clean_content: 剥离元数据块后的纯正文内容
     """
-    # 匹配开头的YAML元数据块（---开头和结尾）
-    meta_pattern = re.compile(r"^---\s*\n(.*?)\n---\s*\n", re.DOTALL)
-    match = meta_pattern.match(md_content)
-
     metadata = {
         "title": "未命名文章",
         "date": datetime.utcnow().strftime("%Y-%m-%d"),
         "description": "",
     }
-    clean_content = md_content
 
-    if match:
-        # 提取元数据块内容并清理正文
-        meta_content = match.group(1)
-        clean_content = md_content[match.end() :].strip()
+    # 不以---开头的文件没有元数据块，无需运行正则
+    if not md_content.startswith("---"):
+        return metadata, md_content
 
-        # 解析title
-        title_match = re.search(r'title:\s*["\'](.*?)["\']', meta_content)
-        if title_match:
-            metadata["title"] = title_match.group(1)
+    # 匹配开头的YAML元数据块（---开头和结尾）
+    match = _META_BLOCK_RE.match(md_content)
+    if not match:
+        return metadata, md_content
 
-        # 解析date
-        date_match = re.search(r'date:\s*["\'](.*?)["\']', meta_content)
-        if date_match:
-            metadata["date"] = date_match.group(1)
+    # 提取元数据块内容并清理正文
+    meta_content = match.group(1)
+    clean_content = md_content[match.end() :].strip()
 
-        # 解析description
-        desc_match = re.search(r'description:\s*["\'](.*?)["\']', meta_content)
-        if desc_match:
-            metadata["description"] = desc_match.group(1)
+    # 一次扫描同时解析title/date/description
+    for field_match in _META_FIELD_RE.finditer(meta_content):
+        metadata[field_match.group(1)] = field_match.group(2)
 
     return metadata, clean_content
 
@@ -125,12 +166,60 @@ def convert_date_to_rfc822(date_str):
         str: RFC 822格式的日期字符串，格式如 "Tue, 20 May 2024 00:00:00 GMT"
     """
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        # 设置为UTC时间的0点，并格式化为RFC 822
-        return date_obj.strftime("%a, %d %b %Y 00:00:00 GMT")
+        year, month, day = map(int, date_str.split("-"))
+        date_obj = date(year, month, day)
     except ValueError:
         # 解析失败时返回当前UTC时间
-        return datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")
+        return _NOW_RFC822
+    # 设置为UTC时间的0点，按查表拼出RFC 822格式（不经过strftime的locale处理）
+    return f"{_WEEKDAYS[date_obj.weekday()]}, {day:02d} {_MONTHS[month - 1]} {year} 00:00:00 GMT"
+
+
+def _load_commit_times():
+    """用一次git log读出每个文件最后一次提交的时间，代替逐个文件调用git
+
+    Returns:
+        dict: 仓库相对路径 -> 最后一次提交的unix时间戳；git不可用时为空字典
+    """
+    try:
+        output = subprocess.check_output(
+            ["git", "-c", "core.quotePath=false", "log", "--name-only", "--pretty=format:%x01%ct"],
+            stderr=subprocess.DEVNULL,
+            encoding="utf-8",
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    # 每条记录：第一行是提交时间，其余行是该提交改动的文件；
+    # git log从新到旧输出，所以每个文件第一次出现的就是最后修改时间
+    commit_times = {}
+    for record in output.split("\x01")[1:]:
+        lines = record.splitlines()
+        timestamp = int(lines[0])
+        for path in lines[1:]:
+            if path:
+                commit_times.setdefault(path, timestamp)
+    return commit_times
+
+
+def get_file_commit_time(file_path, commit_times):
+    """获取文件最后一次提交的时间（RFC 822格式，UTC）
+
+    Args:
+        file_path: 仓库内的文件路径
+        commit_times: _load_commit_times()的返回值
+
+    Returns:
+        str: RFC 822格式的提交时间；文件未提交时返回当前UTC时间
+    """
+    timestamp = commit_times.get(os.path.relpath(file_path, _REPO_ROOT))
+    if timestamp is None:
+        return _NOW_RFC822
+    commit_time = datetime.utcfromtimestamp(timestamp)
+    return (
+        f"{_WEEKDAYS[commit_time.weekday()]}, {commit_time.day:02d} "
+        f"{_MONTHS[commit_time.month - 1]} {commit_time.year} {commit_time:%H:%M:%S} GMT"
+    )
 
 
 def replace_md_image_paths(md_content, md_file_path):
@@ -146,8 +235,12 @@ def replace_md_image_paths(md_content, md_file_path):
     Returns:
         Modified markdown content with absolute image URLs (str).
     """
-    # Regex pattern to match markdown image syntax: ![alt](path) or ![alt](path "title")
-    image_pattern = re.compile(r'!\[(.*?)\]\((.*?)(?:\s+".*?")?\)')
+    # Plain-text posts: a substring check is far cheaper than a regex sub
+    if "![" not in md_content:
+        return md_content
+
+    # Resolved once per file; each match only does path arithmetic
+    md_dir_abs = os.path.abspath(os.path.dirname(md_file_path))
 
     def _replace_image_match(match):
         """Inner function to process each regex match (private by Google style)."""
@@ -158,34 +251,139 @@ def replace_md_image_paths(md_content, md_file_path):
         if img_path.startswith(("http://", "https://")):
             return f"![{alt_text}]({img_path})"
 
-        # Calculate absolute path of the image
-        md_dir = os.path.dirname(md_file_path)
-        abs_img_path = os.path.abspath(os.path.join(md_dir, img_path))
-        repo_root = os.path.abspath("./")
-        rel_img_path = os.path.relpath(abs_img_path, repo_root)
-
-        # Build GitHub RAW URL (encode spaces)
-        img_raw_link = f"{RSS_LINK}{abs_img_path.replace(' ', '%20')}"  # 修复：使用相对仓库根目录的路径
+        if img_path.startswith("/"):
+            # Relative to the repo root (what all posts use): normalizing is enough
+            rel_img_path = os.path.normpath(img_path).lstrip("/")
+        else:
+            # Relative to the markdown file: resolve, then make repo-relative
+            abs_img_path = os.path.normpath(os.path.join(md_dir_abs, img_path))
+            rel_img_path = os.path.relpath(abs_img_path, _REPO_ROOT)
+
+        # Build the image URL from the repo-relative path; existing %-escapes
+        # and the parentheses the image regex may have cut through are kept
+        img_raw_link = f"{RSS_LINK}/{quote(rel_img_path, safe='/%()')}"
         return f"![{alt_text}]({img_raw_link})"
 
-    return image_pattern.sub(_replace_image_match, md_content)
+    return _IMAGE_RE.sub(_replace_image_match, md_content)
+
+
+def _load_render_cache():
+    """读取渲染缓存，缓存不可用或由其他版本的脚本生成时返回空缓存
+
+    Returns:
+        dict: {"tag": 缓存标签, "renders": 内容哈希 -> 渲染结果,
+            "stats": 文件路径 -> [mtime_ns, size, 内容哈希]}；
+            设置了 RSS_CACHE_DISABLE=1 时始终为空缓存
+    """
+    empty_cache = {"tag": _RENDER_CACHE_TAG_HEX, "renders": {}, "stats": {}}
+    if os.environ.get("RSS_CACHE_DISABLE") == "1":
+        return empty_cache
+    try:
+        with open(RENDER_CACHE_FILE, "r", encoding="utf-8") as file_handle:
+            render_cache = json.load(file_handle)
+    except (OSError, ValueError):
+        return empty_cache
+    # 脚本或配置变化后旧条目不会再命中，整体丢弃顺便清理缓存文件
+    if not isinstance(render_cache, dict) or render_cache.get("tag") != _RENDER_CACHE_TAG_HEX:
+        return empty_cache
+    return render_cache
+
+
+def _save_render_cache(render_cache):
+    """原子地写回渲染缓存
+
+    Args:
+        render_cache: 内容哈希 -> 渲染结果的字典
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_file = RENDER_CACHE_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as file_handle:
+        json.dump(render_cache, file_handle, ensure_ascii=False)
+    os.replace(tmp_file, RENDER_CACHE_FILE)
+
+
+@cache
+def _get_md_converter():
+    """Returns the shared markdown-to-HTML function for MD_BACKEND.
+
+    The backend is imported and configured once per process on first use,
+    so extensions are not re-instantiated per file and builds served
+    entirely from the render cache never import it. The Python-Markdown
+    instance is not thread-safe; it is reset() before every conversion.
+
+    Returns:
+        callable: Function taking markdown text (str) and returning HTML (str).
+
+    Raises:
+        ValueError: If MD_BACKEND names an unknown backend.
+    """
+    if MD_BACKEND == "pyromark":
+        import pyromark
+
+        options = 0
+        for option_name in PYROMARK_OPTIONS:
+            options |= getattr(pyromark.Options, option_name)
+        return lambda text: pyromark.html(text, options=options)
+
+    if MD_BACKEND == "markdown":
+        import markdown
+
+        md = markdown.Markdown(extensions=MD_EXTENSIONS, extension_configs=MD_EXTENSION_CONFIGS)
+        return lambda text: md.reset().convert(text)
+
+    raise ValueError(f"Unknown RSS_MD_BACKEND: {MD_BACKEND!r} (expected 'markdown' or 'pyromark')")
+
+
+def _read_file_bytes(file_path):
+    """以二进制方式一次性读取整个文件
+
+    无缓冲的raw文件对象在read()时按fstat得到的大小一次分配缓冲区，
+    小文件通常只需一次read系统调用，也省去了文本解码层的额外拷贝。
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        bytes: 文件内容
+    """
+    with open(file_path, "rb", buffering=0) as file_handle:
+        return file_handle.read()
+
+
+def _render_cache_key(file_path, md_bytes):
+    """计算渲染缓存键：markdown原始字节 + 文件路径 + 扩展配置标签的BLAKE2b哈希
+
+    文件路径决定HTML文件名和相对图片路径的解析，因此也纳入缓存键。
+
+    Args:
+        file_path: markdown文件路径
+        md_bytes: markdown文件的原始字节
+
+    Returns:
+        str: 32位十六进制摘要
+    """
+    return hashlib.blake2b(
+        md_bytes + file_path.encode("utf-8") + _RENDER_CACHE_TAG, digest_size=16
+    ).hexdigest()
 
 
-def md_to_html(file_path):
+def md_to_html(file_path, md_bytes=None):
     """Converts a markdown file to HTML with proper image paths and styling.
 
     Args:
         file_path: Path to the markdown file (str).
+        md_bytes: Raw file content (bytes) if already read; read from
+            file_path when omitted.
 
     Returns:
-        tuple: (full_html, standalone_html, metadata, html_file_name)
-            - full_html: 仅正文的HTML内容（用于RSS）
-            - standalone_html: 完整的独立HTML文件内容（带head/body）
-            - metadata: 解析出的元数据字典
-            - html_file_name: 生成的HTML文件名
+        tuple: 见_build_outputs
     """
-    with open(file_path, "r", encoding="utf-8") as file_handle:
-        md_content = file_handle.read().strip()
+    if md_bytes is None:
+        md_bytes = _read_file_bytes(file_path)
+
+    # 元数据正则只要求开头没有空白，结尾空白不影响markdown转换；
+    # 在bytes上去掉空白再解码，省去一次整串str拷贝
+    md_content = md_bytes.lstrip().decode("utf-8")
 
     # 解析元数据并剥离元数据块
     metadata, clean_md_content = parse_md_metadata(md_content)
@@ -193,15 +391,30 @@ def md_to_html(file_path):
     # 替换图片路径（仅处理正文）
     clean_md_content = replace_md_image_paths(clean_md_content, file_path)
 
-    # 转换正文为HTML
-    html_content = markdown.markdown(
-        clean_md_content,
-        extensions=MD_EXTENSIONS,
-        extension_configs=MD_EXTENSION_CONFIGS,
-    )
+    # 转换正文为HTML（每个文件只解析一次，所有输出共享同一份html_content）
+    html_content = _get_md_converter()(clean_md_content)
+
+    return _build_outputs(html_content, metadata, _html_file_name(file_path))
 
+
+def _build_outputs(html_content, metadata, html_file_name):
+    """由一次markdown转换的结果拼出RSS与独立HTML两种输出
+
+    Args:
+        html_content: markdown正文转换得到的HTML
+        metadata: 元数据字典
+        html_file_name: 生成的HTML文件名
+
+    Returns:
+        tuple: (full_html, standalone_html, metadata, html_file_name, html_content)
+            - full_html: 仅正文的HTML内容（用于RSS）
+            - standalone_html: 完整的独立HTML文件内容（带head/body）
+            - metadata: 解析出的元数据字典
+            - html_file_name: 生成的HTML文件名
+            - html_content: 未包裹的正文HTML
+    """
     # 用于RSS的HTML（仅正文+样式）
-    rss_html = f"<div style='max-width: 800px; margin: 0 auto;'>{HTML_STYLE}{html_content}</div>"
+    rss_html = _RSS_PREFIX + html_content + _RSS_SUFFIX
 
     # 生成独立的完整HTML文件内容（带head/body）
     standalone_html = f"""<!DOCTYPE html>
@@ -219,134 +432,355 @@ def md_to_html(file_path):
 </body>
 </html>"""
 
-    # 生成HTML文件名（替换md后缀为html，保留原文件名）
-    file_name = os.path.basename(file_path)
-    html_file_name = os.path.splitext(file_name)[0] + ".html"
+    return rss_html, standalone_html, metadata, html_file_name, html_content
+
+
+def _html_file_name(file_path):
+    """由markdown文件路径得到HTML文件名（替换md后缀为html，保留原文件名）"""
+    return os.path.splitext(os.path.basename(file_path))[0] + ".html"
+
+
+def _meta_sidecar_path(html_file_name):
+    """HTML文件旁的元数据sidecar路径，如 asset/html/103.meta.json"""
+    return os.path.join(HTML_OUTPUT_DIR, os.path.splitext(html_file_name)[0] + ".meta.json")
+
+
+def _stat_key(file_stat):
+    """用于判断文件是否变化的 [mtime_ns, size]"""
+    return [file_stat.st_mtime_ns, file_stat.st_size]
+
+
+def _load_fresh_sidecar(md_stat, html_file_name):
+    """markdown和HTML文件都与上次save_html_file写入时一致时，读取其sidecar
+
+    只比较HTML是否比markdown新并不可靠：例如用git checkout恢复旧的HTML文件后，
+    它的mtime更新但内容已过期，因此记录两者写入时的stat并要求完全一致。
+
+    Args:
+        md_stat: markdown文件的os.stat_result
+        html_file_name: 对应的HTML文件名
+
+    Returns:
+        dict or None: 包含html_content和metadata的字典；任一文件有变化、sidecar
+            缺失或由不同版本的脚本生成时返回None
+    """
+    html_file_path = os.path.join(HTML_OUTPUT_DIR, html_file_name)
+    try:
+        with open(_meta_sidecar_path(html_file_name), "r", encoding="utf-8") as file_handle:
+            sidecar = json.load(file_handle)
+        html_stat = os.stat(html_file_path)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(sidecar, dict)
+        or sidecar.get("cache_tag") != _RENDER_CACHE_TAG_HEX
+        or sidecar.get("md_stat") != _stat_key(md_stat)
+        or sidecar.get("html_stat") != _stat_key(html_stat)
+    ):
+        return None
+    return sidecar
+
+
+def _process_one(file_path, md_bytes):
+    """进程池/线程池的工作函数（必须定义在模块顶层才能被pickle）
+
+    Returns:
+        tuple: md_to_html的返回值再追加file_path
+    """
+    return md_to_html(file_path, md_bytes) + (file_path,)
 
-    return rss_html, standalone_html, metadata, html_file_name
 
+def _render_posts(md_entries, need_html=True):
+    """转换所有markdown文件，缓存命中的直接复用，其余交给进程池/线程池并行转换
 
-def save_html_file(standalone_html, html_file_name):
-    """保存生成的HTML文件到指定目录
+    Args:
+        md_entries: 已排序的markdown文件os.DirEntry列表（复用其缓存的stat结果）
+        need_html: 是否需要独立HTML文件；为False时，有description的文章
+            在RSS中用不到正文，只解析元数据而不转换markdown
+
+    Returns:
+        list: 与md_entries顺序一致的md_to_html返回值列表；HTML文件已是最新
+            （无需重写）的条目standalone_html为None；跳过转换的条目只有
+            metadata和html_file_name，其余均为None
+    """
+    render_cache = _load_render_cache()
+    renders = render_cache["renders"]
+    old_stats = render_cache["stats"]
+    # 只保留本次仍存在的文件
+    stats = render_cache["stats"] = {}
+    use_sidecars = os.environ.get("RSS_CACHE_DISABLE") != "1"
+    rendered = {}
+    pending_paths, pending_bytes, pending_keys = [], [], []
+
+    for md_entry in md_entries:
+        file_path = md_entry.path
+        # 每个文件只stat一次（DirEntry会缓存结果），sidecar和mtime索引共用
+        file_stat = md_entry.stat()
+
+        stat_key = _stat_key(file_stat)
+        old_stat = old_stats.get(file_path)
+
+        # markdown和HTML都没变时连markdown文件都不用读
+        html_file_name = _html_file_name(file_path)
+        sidecar = _load_fresh_sidecar(file_stat, html_file_name) if use_sidecars else None
+        if sidecar is not None:
+            html_content = sidecar["html_content"]
+            rss_html = _RSS_PREFIX + html_content + _RSS_SUFFIX
+            rendered[file_path] = (rss_html, None, sidecar["metadata"], html_file_name, html_content)
+            # 沿用仍然有效的索引，使其渲染结果不被下面的清理删掉
+            if old_stat is not None and old_stat[:2] == stat_key:
+                stats[file_path] = old_stat
+            continue
+
+        # mtime和大小都没变时沿用上次的内容哈希，不必读取和哈希整个文件
+        md_bytes = None
+        if old_stat is not None and old_stat[:2] == stat_key and old_stat[2] in renders:
+            cache_key = old_stat[2]
+        else:
+            md_bytes = _read_file_bytes(file_path)
+            cache_key = _render_cache_key(file_path, md_bytes)
+        stats[file_path] = stat_key + [cache_key]
+
+        cached = renders.get(cache_key)
+        if cached is not None:
+            rendered[file_path] = _build_outputs(
+                cached["html_content"], cached["metadata"], html_file_name
+            )
+            continue
+
+        if not need_html:
+            # 不输出HTML时，有description的文章只需要元数据（解析元数据的代价远小于转换）
+            metadata, _ = parse_md_metadata(md_bytes.lstrip().decode("utf-8"))
+            if metadata["description"]:
+                rendered[file_path] = (None, None, metadata, html_file_name, None)
+                continue
+
+        pending_paths.append(file_path)
+        pending_bytes.append(md_bytes)
+        pending_keys.append(cache_key)
+
+    # 只有一个文件需要转换时不值得启动进程池；pyromark转换时释放GIL，
+    # 用线程池即可并行，还省去了进程启动和结果的pickle。Python-Markdown
+    # 受GIL限制且实例不是线程安全的，仍使用进程池
+    if len(pending_paths) > 1:
+        executor_class = ThreadPoolExecutor if MD_BACKEND == "pyromark" else ProcessPoolExecutor
+        with executor_class(max_workers=os.cpu_count()) as executor:
+            results = list(executor.map(_process_one, pending_paths, pending_bytes, chunksize=4))
+    else:
+        results = list(map(_process_one, pending_paths, pending_bytes))
+
+    for cache_key, result in zip(pending_keys, results):
+        file_path = result[-1]
+        rendered[file_path] = result[:-1]
+        # 只缓存正文HTML和元数据，两种包裹输出命中时再拼接
+        renders[cache_key] = {"html_content": result[4], "metadata": result[2]}
+
+    # 清理不再被任何文件引用的渲染结果（已修改文章的旧版本、已删除的文章）
+    live_keys = {stat[2] for stat in stats.values()}
+    render_cache["renders"] = {key: value for key, value in renders.items() if key in live_keys}
+    _save_render_cache(render_cache)
+    return [rendered[md_entry.path] for md_entry in md_entries]
+
+
+def save_html_file(standalone_html, html_file_name, html_content, metadata, md_stat):
+    """保存生成的HTML文件到指定目录，并写入供增量构建使用的元数据sidecar
 
     Args:
         standalone_html: 完整的HTML内容
         html_file_name: 要保存的HTML文件名
+        html_content: 未包裹的正文HTML（写入sidecar）
+        metadata: 元数据字典（写入sidecar）
+        md_stat: 源markdown文件的os.stat_result（写入sidecar）
     """
-    # 确保输出目录存在
-    os.makedirs(HTML_OUTPUT_DIR, exist_ok=True)
-    
-    # 拼接完整的HTML文件路径
+    # 拼接完整的HTML文件路径（输出目录由generate_rss_and_html统一创建）
     html_file_path = os.path.join(HTML_OUTPUT_DIR, html_file_name)
     
-    # 写入HTML文件
-    with open(html_file_path, "w", encoding="utf-8") as f:
-        f.write(standalone_html)
+    # 写入HTML文件（一次编码后按字节写入，绕过文本包装层）
+    with open(html_file_path, "wb") as f:
+        f.write(standalone_html.encode("utf-8"))
+
+    # sidecar在HTML之后写入，下次构建时两个文件的stat都没变即可跳过转换
+    sidecar = {
+        "cache_tag": _RENDER_CACHE_TAG_HEX,
+        "md_stat": _stat_key(md_stat),
+        "html_stat": _stat_key(os.stat(html_file_path)),
+        "html_content": html_content,
+        "metadata": metadata,
+    }
+    with open(_meta_sidecar_path(html_file_name), "w", encoding="utf-8") as f:
+        json.dump(sidecar, f, ensure_ascii=False)
     
     print(f"✅ 已生成HTML文件: {html_file_path}")
 
 
-def _prettify_xml(element):
-    """Prettifies XML output with proper indentation (private helper).
+def _iter_md_entries(dir_path):
+    """Recursively yields os.DirEntry objects for markdown files (private helper).
+
+    DirEntry caches the file type from the directory listing and its stat()
+    result after the first call, so callers can use entry.stat() for cache
+    keys without another syscall per lookup. Hidden entries are skipped and
+    symlinked directories are not followed.
 
     Args:
-        element: Root XML element (xml.etree.ElementTree.Element).
+        dir_path: Directory to scan (str).
 
-    Returns:
-        Formatted XML string (str) with UTF-8 encoding and proper indentation.
+    Yields:
+        os.DirEntry: One entry per markdown file.
+    """
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_md_entries(entry.path)
+            elif entry.name.endswith(".md") and entry.is_file():
+                yield entry
+
+
+def _write_xml_element(file_handle, element, level):
+    """Serializes one channel header element (e.g. <title>, <image>) at the
+    given indentation level and writes it out.
+
+    Items are written as preformatted text in generate_rss_and_html and do
+    not go through this helper.
+
+    Args:
+        file_handle: Binary file object to write to.
+        element: xml.etree.ElementTree Element to serialize.
+        level: Indentation level of the element inside the document.
     """
-    rough_xml = ET.tostring(element, "utf-8")
-    parsed_xml = minidom.parseString(rough_xml)
-    pretty_xml = parsed_xml.toprettyxml(indent="  ")
+    ET.indent(element, space="  ", level=level)
+    file_handle.write(b"  " * level + ET.tostring(element, encoding="utf-8") + b"\n")
 
-    # Remove empty lines and redundant XML declaration
-    clean_lines = [
-        line
-        for line in pretty_xml.split("\n")
-        if line.strip() and not line.startswith("<?xml")
-    ]
 
-    # Add proper XML declaration at the top
-    return '<?xml version="1.0" encoding="UTF-8"?>\n' + "\n".join(clean_lines)
+def _cdata(text):
+    """Wraps text in a CDATA section so it is written without entity escaping.
 
+    A literal "]]>" inside the text is split across two sections (private helper).
 
-def generate_rss_and_html():
+    Args:
+        text: Raw text, typically HTML (str).
+
+    Returns:
+        CDATA section (str).
+    """
+    return "<![CDATA[" + text.replace("]]>", "]]]]><![CDATA[>") + "]]>"
+
+
+def generate_rss_and_html(emit_html=True, date_source="yaml"):
     """Main function to generate HTML files and RSS feed XML file.
 
-    Creates RSS 2.0 structure, populates with markdown content,
-    generates HTML files, and writes the final files to disk.
+    Writes the RSS 2.0 channel header, then renders markdown files,
+    generates HTML files and streams one RSS item per post to disk.
+
+    Args:
+        emit_html: Whether to write standalone HTML files to HTML_OUTPUT_DIR.
+        date_source: Where item pubDates come from: "yaml" (front-matter
+            date) or "git" (last commit touching the markdown file).
     """
-    # Create RSS root and channel elements
-    rss_root = ET.Element("rss", version="2.0")
-    channel = ET.SubElement(rss_root, "channel")
-
-    # Add core channel metadata
-    ET.SubElement(channel, "title").text = RSS_TITLE
-    ET.SubElement(channel, "link").text = RSS_LINK
-    ET.SubElement(channel, "description").text = RSS_DESCRIPTION
-    ET.SubElement(channel, "language").text = RSS_LANGUAGE
-    ET.SubElement(channel, "pubDate").text = datetime.utcnow().strftime(
-        "%a, %d %b %Y %H:%M:%S GMT"
-    )
+    # Collect all markdown files first (sorted for a deterministic item order)
+    md_entries = sorted(_iter_md_entries(MD_DIR), key=lambda entry: entry.path)
 
-    # Add RSS icon if file exists
-    if os.path.exists(RSS_ICON_PATH.lstrip("/")):  # Fix path check (remove leading /)
-        icon_link = (
-            f"{RSS_LINK}/{RSS_ICON_PATH.lstrip('/').replace(' ', '%20')}"
+    # git日期只需一次git log，而不是每个文件一次
+    commit_times = _load_commit_times() if date_source == "git" else {}
+
+    # 确保HTML输出目录存在（只需检查一次）
+    os.makedirs(HTML_OUTPUT_DIR, exist_ok=True)
+
+    # 先写入临时文件，全部成功后再替换，避免中途出错留下半个rss.xml
+    tmp_rss_file = RSS_OUTPUT_FILE + ".tmp"
+    with open(tmp_rss_file, "wb") as file_handle:
+        file_handle.write(b'<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0">\n  <channel>\n')
+
+        # Add core channel metadata
+        channel_fields = (
+            ("title", RSS_TITLE),
+            ("link", RSS_LINK),
+            ("description", RSS_DESCRIPTION),
+            ("language", RSS_LANGUAGE),
+            ("pubDate", _NOW_RFC822),
         )
-        image = ET.SubElement(channel, "image")
-        ET.SubElement(image, "url").text = icon_link
-        ET.SubElement(image, "title").text = RSS_TITLE
-        ET.SubElement(image, "link").text = RSS_LINK
-        ET.SubElement(image, "width").text = "144"
-        ET.SubElement(image, "height").text = "144"
-
-    # Process all markdown files in the target directory
-    for root_dir, _, files in os.walk(MD_DIR):
-        for file_name in files:
-            if file_name.endswith(".md") and not file_name.startswith("."):
-                file_path = os.path.join(root_dir, file_name)
-
-                # 转换markdown到HTML并获取元数据
-                rss_html_content, standalone_html, metadata, html_file_name = md_to_html(file_path)
-                
-                # 保存HTML文件到asset/html目录
-                save_html_file(standalone_html, html_file_name)
-
-                # 使用元数据中的日期（转换为RFC 822格式）
+        for tag, text in channel_fields:
+            field_elem = ET.Element(tag)
+            field_elem.text = text
+            _write_xml_element(file_handle, field_elem, 2)
+
+        # Add RSS icon if file exists
+        if _ICON_LINK is not None:
+            image = ET.Element("image")
+            ET.SubElement(image, "url").text = _ICON_LINK
+            ET.SubElement(image, "title").text = RSS_TITLE
+            ET.SubElement(image, "link").text = RSS_LINK
+            ET.SubElement(image, "width").text = "144"
+            ET.SubElement(image, "height").text = "144"
+            _write_xml_element(file_handle, image, 2)
+
+        # Process all markdown files in the target directory
+        for md_entry, rendered_post in zip(md_entries, _render_posts(md_entries, need_html=emit_html)):
+            rss_html_content, standalone_html, metadata, html_file_name, html_content = rendered_post
+
+            # 保存HTML文件到asset/html目录（已是最新的跳过）
+            if emit_html and standalone_html is not None:
+                save_html_file(standalone_html, html_file_name, html_content, metadata, md_entry.stat())
+
+            # 使用元数据中的日期或git提交时间（转换为RFC 822格式）
+            if date_source == "git":
+                pub_date = get_file_commit_time(md_entry.path, commit_times)
+            else:
                 pub_date = convert_date_to_rfc822(metadata["date"])
 
-                # 使用元数据中的标题
-                item_title = metadata["title"]
-                
-                item_link = f"{RSS_LINK}/{HTML_OUTPUT_DIR}/{html_file_name.replace(' ', '%20')}"
-                
-                # Create RSS item
-                item = ET.SubElement(channel, "item")
-                ET.SubElement(item, "title").text = item_title
-                ET.SubElement(item, "link").text = item_link
-
-                # 优先使用元数据中的description，没有则用正文摘要
-                item_description = (
-                    metadata["description"]
-                    if metadata["description"]
-                    else rss_html_content[:200] + "..."
-                )
-                desc_elem = ET.SubElement(item, "description")
-                desc_elem.text = item_description if metadata["description"] else rss_html_content
-                ET.SubElement(item, "pubDate").text = pub_date
-                ET.SubElement(item, "guid").text = item_link  # Unique identifier (使用HTML链接)
-
-    # Generate and write prettified XML
-    final_xml = _prettify_xml(rss_root)
-    with open(RSS_OUTPUT_FILE, "w", encoding="utf-8") as file_handle:
-        file_handle.write(final_xml)
-    
+            # 使用元数据中的标题
+            item_title = metadata["title"]
+
+            item_link = _POST_URL_BASE + quote(html_file_name)
+
+            # 优先使用元数据中的description，没有则用完整正文HTML（放在CDATA里原样输出）
+            if metadata["description"]:
+                item_description = escape(metadata["description"])
+            else:
+                item_description = _cdata(rss_html_content)
+
+            # Items have a fixed shape, so they are formatted directly instead
+            # of building and serializing an element tree per post
+            item_link = escape(item_link)
+            item_xml = (
+                "    <item>\n"
+                f"      <title>{escape(item_title)}</title>\n"
+                f"      <link>{item_link}</link>\n"
+                f"      <description>{item_description}</description>\n"
+                f"      <pubDate>{pub_date}</pubDate>\n"
+                f"      <guid>{item_link}</guid>\n"  # Unique identifier (使用HTML链接)
+                "    </item>\n"
+            )
+            file_handle.write(item_xml.encode("utf-8"))
+
+        file_handle.write(b"  </channel>\n</rss>")
+
+    os.replace(tmp_rss_file, RSS_OUTPUT_FILE)
     print(f"✅ 已生成RSS文件: {RSS_OUTPUT_FILE}")
 
 
 # -----------------------------------------------------------------------------
 # Main Execution
 # -----------------------------------------------------------------------------
+def main():
+    """Parses command line flags and runs the generator."""
+    parser = argparse.ArgumentParser(description="Generate rss.xml and HTML files from post/*.md")
+    parser.add_argument(
+        "--emit-html",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=f"write standalone HTML files to {HTML_OUTPUT_DIR} (default: on)",
+    )
+    parser.add_argument(
+        "--date-source",
+        choices=("yaml", "git"),
+        default="yaml",
+        help="take item pubDate from the front-matter date or the last git commit (default: yaml)",
+    )
+    args = parser.parse_args()
+    generate_rss_and_html(emit_html=args.emit_html, date_source=args.date_source)
+
+
 if __name__ == "__main__":
-    generate_rss_and_html()
+    main()